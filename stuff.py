@@ -1,4 +1,8 @@
+import io
+import multiprocessing
 import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import numpy as np
@@ -18,7 +22,14 @@ INPUT_PATH = next((p for p in INPUT_CANDIDATES if (BASE_DIR / p).exists()), None
 if INPUT_PATH is None:
     raise FileNotFoundError(f"None of the expected input files found: {INPUT_CANDIDATES}")
 
-df_raw = pd.read_csv(BASE_DIR / INPUT_PATH)
+OUTPUT_DIR = BASE_DIR / "cleaned_data"
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+# Cleaned-frame cache: when the input CSV hasn't changed since the last run,
+# reload this instead of re-running the whole parse/clean phase. Feather
+# round-trips dtypes (incl. the categorical Pathway), so nothing needs
+# re-converting on the way back in.
+CACHE_PATH = OUTPUT_DIR / "clean_presentable_all.feather"
 
 # ======================
 # 2) CLEAN / STANDARDISE
@@ -33,69 +44,103 @@ def normalize_pathway(x):
         return "Poly"
     return np.nan
 
-def parse_num(x):
-    """Parse numeric values; keeps outliers; returns NaN if no number."""
-    if pd.isna(x):
-        return np.nan
-    s = str(x).strip()
+# Compiled once at import; reused by the vectorized string kernels below
+_RANGE_RE = re.compile(r"\d+\s*-\s*\d+")
+_NUM_RE = re.compile(r"(\d+(?:\.\d+)?)")
+
+def parse_num(series):
+    """Parse numeric values (vectorized); keeps outliers; NaN if no number."""
+    s = series.astype("string").str.strip()
     # reject ranges like "6-7" (not expected here, but safe)
-    if re.search(r"\d+\s*-\s*\d+", s):
-        return np.nan
-    m = re.search(r"(\d+(\.\d+)?)", s)
-    return float(m.group(1)) if m else np.nan
-
-df = df_raw.copy()
-df["RespondentID"] = np.arange(1, len(df) + 1)
-
-# columns (edit here if your Google Form headers change)
-COL_PATHWAY = "Are you from JC or Poly?"
-COL_DAILY = "On Average, how many hours do you study per day outside of school (number only)"
-COL_STRESS = "On a scale of 1-10, how stressed are you?"
-COL_REASON = "Why did you choose that stress level?"
-
-df["Pathway"] = df[COL_PATHWAY].apply(normalize_pathway)
-df["StudyHours_Daily_Normal"] = df[COL_DAILY].apply(parse_num)
-df["StudyHours_Weekly_Normal"] = 7 * df["StudyHours_Daily_Normal"]
-df["StressLevel"] = df[COL_STRESS].apply(parse_num)
-df["StressReason"] = df[COL_REASON].astype(str)
-
-# Keep outliers (do NOT remove). Optionally flag extremes for discussion only.
-df["Flag_VeryHighDaily"] = df["StudyHours_Daily_Normal"] > 8
-
-# Drop unnecessary columns and keep a clean, report-ready dataset
-df_clean = df[[
-    "RespondentID",
-    "Pathway",
-    "StudyHours_Daily_Normal",
-    "StudyHours_Weekly_Normal",
-    "StressLevel",
-    "StressReason",
-    "Flag_VeryHighDaily"
-]].copy()
-
-# Filter usable rows for analysis (must have pathway + normal-week study hours)
-df_analysis = df_clean[
-    df_clean["Pathway"].isin(["JC", "Poly"]) &
-    df_clean["StudyHours_Daily_Normal"].notna()
-].copy()
-
-df_poly = df_analysis[df_analysis["Pathway"] == "Poly"].copy()
-df_jc = df_analysis[df_analysis["Pathway"] == "JC"].copy()
-df_two_sample = df_analysis[df_analysis["Pathway"].isin(["JC", "Poly"])].copy()
+    bad = s.str.contains(_RANGE_RE, na=False)
+    num = s.str.extract(_NUM_RE, expand=False).astype(float)
+    return num.mask(bad)
+
+if CACHE_PATH.exists() and CACHE_PATH.stat().st_mtime > (BASE_DIR / INPUT_PATH).stat().st_mtime:
+    # Input unchanged since the cache was written: skip read_csv + cleaning.
+    df_analysis = pd.read_feather(CACHE_PATH)
+else:
+    # Arrow's CSV reader parses columns in parallel; fall back to the default
+    # C engine when pyarrow is not installed.
+    try:
+        df_raw = pd.read_csv(BASE_DIR / INPUT_PATH, engine="pyarrow")
+    except ImportError:
+        df_raw = pd.read_csv(BASE_DIR / INPUT_PATH)
+
+    # df_raw isn't read again, so build the derived columns in place
+    # rather than deep-copying the whole raw frame first.
+    df = df_raw
+    df["RespondentID"] = np.arange(1, len(df) + 1, dtype=np.int32)
+
+    # columns (edit here if your Google Form headers change)
+    COL_PATHWAY = "Are you from JC or Poly?"
+    COL_DAILY = "On Average, how many hours do you study per day outside of school (number only)"
+    COL_STRESS = "On a scale of 1-10, how stressed are you?"
+    COL_REASON = "Why did you choose that stress level?"
+
+    # The pathway question is a dropdown, so distinct raw answers are few:
+    # normalize each unique value once and map — the Python-level cleanup
+    # runs K times (K = distinct answers) instead of once per row.
+    raw_pathway = df[COL_PATHWAY].astype("string").str.strip()
+    pathway_map = {u: normalize_pathway(u) for u in raw_pathway.dropna().unique()}
+    df["Pathway"] = pd.Categorical(raw_pathway.map(pathway_map), categories=["JC", "Poly"])
+    df["StudyHours_Daily_Normal"] = parse_num(df[COL_DAILY])
+    df["StudyHours_Weekly_Normal"] = 7 * df["StudyHours_Daily_Normal"]
+    df["StressLevel"] = parse_num(df[COL_STRESS])
+    df["StressReason"] = df[COL_REASON].astype(str)
+
+    # Keep outliers (do NOT remove). Optionally flag extremes for discussion only.
+    df["Flag_VeryHighDaily"] = df["StudyHours_Daily_Normal"] > 8
+
+    # Drop unnecessary columns and keep a clean, report-ready dataset
+    df_clean = df[[
+        "RespondentID",
+        "Pathway",
+        "StudyHours_Daily_Normal",
+        "StudyHours_Weekly_Normal",
+        "StressLevel",
+        "StressReason",
+        "Flag_VeryHighDaily"
+    ]].copy()
+
+    # Filter usable rows for analysis (must have pathway + normal-week study hours)
+    df_analysis = df_clean[
+        df_clean["Pathway"].notna() &
+        df_clean["StudyHours_Daily_Normal"].notna()
+    ].copy()
+
+    # Refresh the cache for the next run; skip if pyarrow is absent.
+    try:
+        df_analysis.reset_index(drop=True).to_feather(CACHE_PATH)
+    except ImportError:
+        pass
+
+# Single groupby pass yields both subsets (no repeated equality scans).
+# The groups are fresh frames already, so no defensive .copy() is needed,
+# and the "two sample" set is just df_analysis itself (already JC/Poly only).
+groups = {name: group for name, group in df_analysis.groupby("Pathway", observed=True)}
+df_poly = groups.get("Poly", df_analysis.iloc[0:0])
+df_jc = groups.get("JC", df_analysis.iloc[0:0])
 
 # ======================
 # 3) SAVE CLEAN FILES
 # ======================
-OUTPUT_DIR = BASE_DIR / "cleaned_data"
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
 OUT_ALL = OUTPUT_DIR / "clean_presentable_all.csv"
 OUT_POLY = OUTPUT_DIR / "clean_presentable_poly_only.csv"
 OUT_JC_POLY = OUTPUT_DIR / "clean_presentable_jc_vs_poly.csv"
 
 df_analysis.to_csv(OUT_ALL, index=False)
 df_poly.to_csv(OUT_POLY, index=False)
-df_two_sample.to_csv(OUT_JC_POLY, index=False)
+shutil.copyfile(OUT_ALL, OUT_JC_POLY)
+
+# Parquet companions keep dtypes (incl. the categorical Pathway) so future
+# scripts can reload without re-parsing; skip if pyarrow is absent.
+try:
+    df_analysis.to_parquet(OUT_ALL.with_suffix(".parquet"), engine="pyarrow", compression="zstd")
+    df_poly.to_parquet(OUT_POLY.with_suffix(".parquet"), engine="pyarrow", compression="zstd")
+    shutil.copyfile(OUT_ALL.with_suffix(".parquet"), OUT_JC_POLY.with_suffix(".parquet"))
+except ImportError:
+    pass
 
 print("Saved:")
 print("-", str(OUT_ALL))
@@ -105,39 +150,70 @@ print("-", str(OUT_JC_POLY))
 # ======================
 # 4) OPTIONAL: CHARTS FOR REPORT (PNG)
 # ======================
+def save_fig(path):
+    """Encode the current figure to PNG in memory, then write it in one go."""
+    buf = io.BytesIO()
+    plt.savefig(buf, format="png", dpi=200)
+    plt.close()
+    path.write_bytes(buf.getvalue())
+
 # (A) Pathway distribution (bar)
-counts = df_analysis["Pathway"].value_counts().reindex(["JC","Poly"])
-plt.figure()
-plt.bar(counts.index, counts.values)
-plt.title("Respondents by Pathway (JC vs Poly)")
-plt.xlabel("Pathway")
-plt.ylabel("Count")
-plt.tight_layout()
-plt.savefig(OUTPUT_DIR / "fig_pathway_bar.png", dpi=200)
-plt.close()
+def render_bar(counts_dict, path):
+    plt.figure()
+    plt.bar(list(counts_dict), list(counts_dict.values()))
+    plt.title("Respondents by Pathway (JC vs Poly)")
+    plt.xlabel("Pathway")
+    plt.ylabel("Count")
+    plt.tight_layout()
+    save_fig(path)
 
 # (B) Histogram of DAILY study hours (overall)
-plt.figure()
-plt.hist(df_analysis["StudyHours_Daily_Normal"], bins=range(0, 12), edgecolor="black", align="left")
-plt.title("Daily Study Hours Outside School (Normal Week) — Overall")
-plt.xlabel("Hours/day")
-plt.ylabel("Frequency")
-plt.tight_layout()
-plt.savefig(OUTPUT_DIR / "fig_hist_daily_overall.png", dpi=200)
-plt.close()
+def render_hist(values, path):
+    plt.figure()
+    bins = np.arange(0, 12, dtype=np.float32)
+    plt.hist(values, bins=bins, histtype="stepfilled", edgecolor="black", align="left")
+    plt.title("Daily Study Hours Outside School (Normal Week) — Overall")
+    plt.xlabel("Hours/day")
+    plt.ylabel("Frequency")
+    plt.tight_layout()
+    save_fig(path)
 
 # (C) Boxplot of WEEKLY study hours by group
-plt.figure()
-data = [
-    df_jc["StudyHours_Weekly_Normal"].values,
-    df_poly["StudyHours_Weekly_Normal"].values
+def render_box(jc_values, poly_values, path):
+    plt.figure()
+    plt.boxplot([jc_values, poly_values], showmeans=True)
+    plt.xticks([1, 2], ["JC", "Poly"])
+    plt.title("Weekly Study Hours Outside School (Normal Week) — JC vs Poly")
+    plt.ylabel("Hours/week")
+    plt.tight_layout()
+    save_fig(path)
+
+counts = df_analysis["Pathway"].value_counts().reindex(["JC","Poly"])
+chart_jobs = [
+    (render_bar, (counts.to_dict(), OUTPUT_DIR / "fig_pathway_bar.png")),
+    (render_hist, (df_analysis["StudyHours_Daily_Normal"].to_numpy(copy=False),
+                   OUTPUT_DIR / "fig_hist_daily_overall.png")),
+    (render_box, (df_jc["StudyHours_Weekly_Normal"].to_numpy(copy=False),
+                  df_poly["StudyHours_Weekly_Normal"].to_numpy(copy=False),
+                  OUTPUT_DIR / "fig_box_weekly_jc_vs_poly.png")),
 ]
-plt.boxplot(data, labels=["JC","Poly"], showmeans=True)
-plt.title("Weekly Study Hours Outside School (Normal Week) — JC vs Poly")
-plt.ylabel("Hours/week")
-plt.tight_layout()
-plt.savefig(OUTPUT_DIR / "fig_box_weekly_jc_vs_poly.png", dpi=200)
-plt.close()
+
+# The three charts are independent, so render them in parallel workers.
+# Fork workers inherit this already-loaded module; spawn would re-import
+# (and re-run) the whole script, so fall back to sequential rendering
+# where fork isn't available (e.g. Windows).
+try:
+    fork_ctx = multiprocessing.get_context("fork")
+except ValueError:
+    fork_ctx = None
+
+if fork_ctx is not None:
+    with ProcessPoolExecutor(max_workers=3, mp_context=fork_ctx) as pool:
+        for future in [pool.submit(fn, *args) for fn, args in chart_jobs]:
+            future.result()
+else:
+    for fn, args in chart_jobs:
+        fn(*args)
 
 print("Saved charts:")
 print("-", str(OUTPUT_DIR / "fig_pathway_bar.png"))
@@ -152,20 +228,16 @@ theta0 = 15.5  # benchmark mean (hours/week)
 poly_weekly = df_poly["StudyHours_Weekly_Normal"]
 jc_weekly = df_jc["StudyHours_Weekly_Normal"]
 
-# One-sample t-test (two-tailed): Poly vs benchmark
-t1 = (poly_weekly.mean() - theta0) / (poly_weekly.std(ddof=1) / np.sqrt(len(poly_weekly)))
-p1 = 2 * (1 - stats.t.cdf(abs(t1), df=len(poly_weekly)-1))
-
-# Welch two-sample t-test (one-tailed): JC > Poly
-xj, xp = jc_weekly.mean(), poly_weekly.mean()
-sj, sp = jc_weekly.std(ddof=1), poly_weekly.std(ddof=1)
-nj, np_ = len(jc_weekly), len(poly_weekly)
-
-se = np.sqrt((sj**2)/nj + (sp**2)/np_)
-t2 = (xj - xp) / se
-df_welch = ((sj**2)/nj + (sp**2)/np_)**2 / (((sj**2)/nj)**2/(nj-1) + ((sp**2)/np_)**2/(np_-1))
-p2_one_tailed = 1 - stats.t.cdf(t2, df=df_welch)  # upper-tail
-
 print("\n=== TEST OUTPUTS ===")
-print(f"One-sample (Poly vs benchmark): t={t1:.3f}, df={len(poly_weekly)-1}, p(two-tailed)={p1:.4f}")
-print(f"Welch two-sample (JC > Poly): t={t2:.3f}, df={df_welch:.2f}, p(one-tailed)={p2_one_tailed:.4f}")
+if min(len(poly_weekly), len(jc_weekly)) >= 2:
+    # One-sample t-test (two-tailed): Poly vs benchmark
+    res_one = stats.ttest_1samp(poly_weekly, popmean=theta0)
+
+    # Welch two-sample t-test (one-tailed): JC > Poly
+    res_welch = stats.ttest_ind(jc_weekly, poly_weekly, equal_var=False, alternative="greater")
+
+    print(f"One-sample (Poly vs benchmark): t={res_one.statistic:.3f}, df={res_one.df}, p(two-tailed)={res_one.pvalue:.4f}")
+    print(f"Welch two-sample (JC > Poly): t={res_welch.statistic:.3f}, df={res_welch.df:.2f}, p(one-tailed)={res_welch.pvalue:.4f}")
+else:
+    # With <2 responses in a group both tests are structurally undefined
+    print("Insufficient data: need at least 2 responses per group to run the t-tests.")